@@ -0,0 +1,106 @@
+# ============================================================
+# 롤링 상관계수 블록 부트스트랩 (신뢰 구간)
+# 프로세스 풀 워커에서 import 할 수 있도록 app.py와 분리된 순수 NumPy 모듈
+# ============================================================
+
+from concurrent.futures import wait
+
+import numpy as np
+
+
+def block_bootstrap_counts(window, n_resamples, block, rng):
+    """이동 블록 부트스트랩 리샘플을 윈도우 내 위치별 선택 횟수로 표현
+
+    반환값: shape (n_resamples, window) — 각 행의 합은 window
+    """
+    n_blocks = -(-window // block)
+    starts = rng.integers(0, window - block + 1, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_resamples, -1)[:, :window]
+    counts = np.zeros((n_resamples, window))
+    np.add.at(counts, (np.arange(n_resamples)[:, None], idx), 1)
+    return counts
+
+
+def bootstrap_corr_batch(xw, yw, counts):
+    """모든 윈도우에 같은 리샘플(선택 횟수)을 적용해 상관계수 계산
+
+    리샘플 합계를 (n_windows, window) @ (window, n_resamples) 행렬곱으로 구한다.
+    xw, yw: shape (n_windows, window)
+    counts: shape (n_resamples, window)
+    반환값: shape (n_windows, n_resamples)
+    """
+    n = counts[0].sum()
+    ct = counts.T
+    sx, sy = xw @ ct, yw @ ct
+    sxx, syy, sxy = (xw * xw) @ ct, (yw * yw) @ ct, (xw * yw) @ ct
+    num = n * sxy - sx * sy
+    den = np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return num / den
+
+
+def bootstrap_bands(x, y, window, step=1, n_resamples=1000, block=None, alpha=0.05,
+                    batch_size=250, executor=None, timeout=None, seed=0):
+    """롤링 상관계수의 블록 부트스트랩 신뢰 구간
+
+    x, y: 1차원 수익률 배열 (같은 길이, 결측 없음)
+    step 간격의 윈도우와 마지막 윈도우를 계산하며, 리샘플은 batch_size 단위로 나눠
+    executor(프로세스 풀)가 있으면 병렬로 계산하며, timeout(초) 안에 끝나지 않으면
+    남은 작업을 취소하고 TimeoutError를 발생시킨다.
+    반환값: (윈도우 끝 위치 배열, 하한 배열, 상한 배열)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < window:
+        empty = np.array([], dtype=int)
+        return empty, empty.astype(float), empty.astype(float)
+
+    block = block or max(2, round(window ** (1 / 3)))
+    positions = np.arange(window - 1, len(x), step)
+    if positions[-1] != len(x) - 1:
+        positions = np.append(positions, len(x) - 1)
+    xw = np.lib.stride_tricks.sliding_window_view(x, window)[positions - window + 1]
+    yw = np.lib.stride_tricks.sliding_window_view(y, window)[positions - window + 1]
+
+    rng = np.random.default_rng(seed)
+    batches = [
+        block_bootstrap_counts(window, min(batch_size, n_resamples - start), block, rng)
+        for start in range(0, n_resamples, batch_size)
+    ]
+    if executor is None:
+        results = [bootstrap_corr_batch(xw, yw, counts) for counts in batches]
+    else:
+        futures = [executor.submit(bootstrap_corr_batch, xw, yw, counts) for counts in batches]
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            for f in not_done:
+                f.cancel()
+            raise TimeoutError(f"부트스트랩 워커가 {timeout}초 안에 응답하지 않음")
+        results = [f.result() for f in futures]
+
+    corrs = np.concatenate(results, axis=1)
+    lower, upper = np.nanquantile(corrs, [alpha / 2, 1 - alpha / 2], axis=1)
+    return positions, lower, upper
+
+
+def bootstrap_last_bands(x, Y, n_resamples=1000, block=None, alpha=0.05, seed=0):
+    """한 구간의 x 와 여러 자산 Y 의 상관계수 블록 부트스트랩 신뢰 구간
+
+    모든 자산에 같은 리샘플을 적용해 한 번의 행렬곱으로 계산한다.
+    x: shape (window,), Y: shape (window, n_assets) — 결측이 있는 자산은 NaN
+    반환값: (하한 배열, 상한 배열) shape (n_assets,)
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    window = len(x)
+    block = block or max(2, round(window ** (1 / 3)))
+    counts = block_bootstrap_counts(window, n_resamples, block, np.random.default_rng(seed))
+    corrs = bootstrap_corr_batch(np.broadcast_to(x, (Y.shape[1], window)), Y.T, counts)
+    finite = np.isfinite(corrs).any(axis=1)
+    lower = np.full(Y.shape[1], np.nan)
+    upper = np.full(Y.shape[1], np.nan)
+    if finite.any():
+        lower[finite], upper[finite] = np.nanquantile(
+            corrs[finite], [alpha / 2, 1 - alpha / 2], axis=1
+        )
+    return lower, upper